@@ -1,3 +1,4 @@
 from .node import Node
 from .network import Network
 from .factor import Factor
+from .log_factor import LogFactor
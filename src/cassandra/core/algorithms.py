@@ -0,0 +1,46 @@
+from .factor import Factor
+
+from typing import List
+
+def sum_product_eliminate(factors: List[Factor], variable: str) -> List[Factor]:
+    """
+    Eliminates a variable from a list of factors, as a single step of the
+    sum-product variable elimination algorithm.
+
+    All of the factors whose scope contains the variable are multiplied
+    together, and the variable summed out, in a single n-ary contraction. The
+    factors whose scope does not contain the variable are left untouched.
+
+    Args:
+    - factors (List[Factor]): a list of factors
+    - variable (str): the variable to eliminate
+
+    Raises:
+    - ValueError: if the factors are not a list of Factor instances
+    - TypeError: if any of the factors is a LogFactor
+
+    Returns: a new list of factors, none of which contain the variable in
+    their scope
+    """
+    # Check validity of inputs
+    # 0. Check variable types
+    if not isinstance(factors, list):
+        raise ValueError("The factors must be a list")
+    if not all(isinstance(factor, Factor) for factor in factors):
+        raise ValueError("The factors must be instances of the Factor class")
+    if any(factor._log_space for factor in factors):
+        raise TypeError("The factors must be linear-space Factors, not LogFactors")
+
+    # Partition the factors by whether they contain the variable
+    relevant_factors = [factor for factor in factors if variable in factor._scope_set]
+    irrelevant_factors = [factor for factor in factors if variable not in factor._scope_set]
+    if len(relevant_factors) == 0:
+        return irrelevant_factors
+
+    # Multiply the relevant factors together and sum out the variable in a
+    # single contraction, without materialising their full product; if the
+    # variable is the only one in their scopes, the result is a constant, i.e.
+    # a factor with an empty scope
+    tau = Factor._product(relevant_factors, variable)
+
+    return irrelevant_factors + [tau]
@@ -10,15 +10,35 @@ class Factor:
 
     Attributes:
     - scope (List[str]): an ordered list of variable names
-    - values (np.ndarray): an array of pseduo-probabilities, where the shape
-        is determined by the cardinality of the variables
+    - values (np.ndarray): a C-contiguous array of pseduo-probabilities, where
+        the shape is determined by the cardinality of the variables
 
     Methods:
     - evaluate: evaluates the factor given a set of assignments to the variables
+    - evaluate_batch: evaluates the factor given a batch of assignments to the variables
     - multiply: multiplies the factor with another factor and returns a new factor
+    - product: multiplies a list of factors together, optionally summing out a
+        variable, and returns a new factor
+    - reduce: fixes some variables to observed values and returns a new factor
     - sum_out: sums out a variable from the factor and returns a new factor
     - normalise: normalises the factor
     """
+    # The maximum number of einsum contraction paths to cache
+    EINSUM_PATH_CACHE_SIZE = 1024
+
+    # The minimum size of the full, uncontracted product for which a
+    # contraction path is followed, rather than contracting in a single pass
+    EINSUM_PATH_MIN_SIZE = 4096
+
+    # Whether the values are stored in log space; see LogFactor. The
+    # linear-space operations reject log-space operands, whose values would
+    # otherwise be silently multiplied rather than added
+    _log_space = False
+
+    # Contraction paths, keyed by the labels and shapes of the operands and the
+    # output labels; see _get_einsum_path
+    _einsum_paths = {}
+
     def __init__(self, scope: List[str], values: np.ndarray) -> None:
         """
         Initializes a factor.
@@ -47,7 +67,8 @@ class Factor:
             raise ValueError("The values must be floats")
 
         # 1. Check that the scope is composed of unique variables
-        if len(set(scope)) != len(scope):
+        scope_set = frozenset(scope)
+        if len(scope_set) != len(scope):
             raise ValueError("The scope must be unique")
 
         # 2. Check that the shape of the values is consistent with the scope
@@ -56,7 +77,36 @@ class Factor:
             raise ValueError(f"There are {n_scope} scope, but the values array has {len(values.shape)} dimensions")
 
         self.scope = scope
-        self.values = values
+        # Store the values in C order, copying only if they are not already,
+        # so that einsum and the NumPy reductions work on contiguous memory
+        self.values = values if values.flags.c_contiguous else np.copy(values, order="C")
+
+        # Keep a frozen copy of the scope for constant-time membership tests
+        self._scope_set = scope_set
+
+    @classmethod
+    def _unchecked(cls, scope: List[str], values: np.ndarray) -> 'Factor':
+        """
+        Creates a factor without validating the inputs. This is intended for
+        internal callers whose scope and values are consistent by construction,
+        e.g. the results of products, reductions and sums.
+
+        Args:
+        - scope (List[str]): a list of unique variable names
+        - values (np.ndarray): an array of floats with one dimension per
+            variable in the scope
+
+        Raises: None
+
+        Returns: a new factor
+        """
+        factor = cls.__new__(cls)
+        factor.scope = scope
+        # As in __init__, store the values in C order; some einsum contraction
+        # paths, for example, return strided views
+        factor.values = values if values.flags.c_contiguous else np.copy(values, order="C")
+        factor._scope_set = frozenset(scope)
+        return factor
 
     def evaluate(self, assignments: dict[str, int]) -> float:
         """
@@ -76,23 +126,70 @@ class Factor:
         # 0. Check variable types
         if not isinstance(assignments, dict):
             raise ValueError("The assignments must be a dictionary")
-        if not all(isinstance(var, str) for var in assignments.keys()):
+        if not all(isinstance(var, str) for var in assignments):
             raise ValueError("The keys of the assignments must be strings")
         if not all(isinstance(val, int) for val in assignments.values()):
             raise ValueError("The values of the assignments must be integers")
         # 1. Check that the assignments are exactly the variables in the scope
-        if not set(self.scope) == set(assignments.keys()):
+        if not self._scope_set == assignments.keys():
             raise ValueError("The assignments are invalid")
-        # 2. Check that the assignments are within the cardinality of the variables
-        for variable_name, value in assignments.items():
-            if value < 0 or value >= self.values.shape[self.scope.index(variable_name)]:
-                raise ValueError(f"The value {value} is invalid for variable {variable_name}")
 
         # Find the indices of the assignments
-        indices = [assignments[var] for var in self.scope]
+        indices = tuple(assignments[var] for var in self.scope)
+
+        # 2. Check that the assignments are within the cardinality of the
+        #    variables; the indices are aligned with the axes of the values
+        #    array, so no scope lookups are needed
+        for variable_name, value, cardinality in zip(self.scope, indices, self.values.shape):
+            if value < 0 or value >= cardinality:
+                raise ValueError(f"The value {value} is invalid for variable {variable_name}")
 
         # Index into the values array
-        return self.values[tuple(indices)]
+        return self.values[indices]
+
+    def evaluate_batch(self, assignments: dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Evaluates the factor given a batch of assignments to the variables, in
+        a single vectorised lookup.
+
+        Args:
+        - assignments (dict[str, np.ndarray]): a dictionary mapping each
+            variable to a 1-dimensional integer array of assignments, where
+            all arrays have the same length
+
+        Raises:
+        - ValueError: if the assignments are not a dictionary of integer arrays
+        - ValueError: if the assignments are not exactly the variables in the scope
+        - ValueError: if the arrays of assignments do not have the same length
+        - ValueError: if the assignments are not within the cardinality of the variables
+
+        Returns: a 1-dimensional array of the values of the factor, one per
+        assignment in the batch
+        """
+        # Check validity of inputs
+        # 0. Check variable types
+        if not isinstance(assignments, dict):
+            raise ValueError("The assignments must be a dictionary")
+        if not all(isinstance(val, np.ndarray) and np.issubdtype(val.dtype, np.integer) for val in assignments.values()):
+            raise ValueError("The values of the assignments must be integer arrays")
+        # 1. Check that the assignments are exactly the variables in the scope
+        if not self._scope_set == assignments.keys():
+            raise ValueError("The assignments are invalid")
+
+        # Find the index arrays of the assignments
+        indices = tuple(assignments[var] for var in self.scope)
+
+        # 2. Check that the arrays are 1-dimensional and of the same length
+        if len(set(index.shape for index in indices)) > 1 or any(index.ndim != 1 for index in indices):
+            raise ValueError("The assignments must be 1-dimensional arrays of the same length")
+        # 3. Check that the assignments are within the cardinality of the
+        #    variables, using one vectorised comparison per variable
+        for variable_name, index, cardinality in zip(self.scope, indices, self.values.shape):
+            if np.any((index < 0) | (index >= cardinality)):
+                raise ValueError(f"The values are invalid for variable {variable_name}")
+
+        # Gather all the values from the values array at once
+        return self.values[indices]
 
     def multiply(self, other: 'Factor') -> 'Factor':
         """
@@ -103,30 +200,174 @@ class Factor:
         - other (Factor): the other factor to multiply
 
         Raises:
-        None
+        - ValueError: if the other factor is not a Factor
+        - TypeError: if the other factor is a LogFactor
 
         Returns: a new factor that is the product of the two factors
         """
         # Check validity of inputs
-        # 0. Check that the other factor is a Factor
+        # 0. Check that the other factor is a linear-space Factor
         if not isinstance(other, Factor):
             raise ValueError("The other factor must be a Factor")
+        if other._log_space:
+            raise TypeError("A Factor cannot be multiplied by a LogFactor")
+
+        return Factor._product([self, other])
+
+    @staticmethod
+    def product(factors: List['Factor'], variable: str = None) -> 'Factor':
+        """
+        Multiplies an arbitrary number of factors together in a single pass,
+        and returns a new, composite factor with a scope that is the ordered
+        union of the scopes of the factors.
+
+        This avoids the intermediate factors that are created when chaining
+        pairwise multiplications, e.g. (f1 * f2) * f3. If a variable is given,
+        it is summed out within the same contraction, which is equivalent to
+        product(factors).sum_out(variable) but never materialises the full
+        product.
+
+        Args:
+        - factors (List[Factor]): a non-empty list of factors to multiply
+        - variable (str): if provided, a variable to sum out of the product
 
-        # Combine the scopes
-        new_scope = self.scope + [var for var in other.scope if var not in self.scope]
+        Raises:
+        - ValueError: if the factors are not a non-empty list
+        - ValueError: if any of the factors is not a Factor
+        - TypeError: if any of the factors is a LogFactor
+        - ValueError: if the variable is not in the scope of any of the factors
+        - ValueError: if the variable is the only variable in the product
+
+        Returns: a new factor that is the product of all the factors, with the
+        variable summed out if one is given
+        """
+        # Check validity of inputs
+        # 0. Check variable types
+        if not isinstance(factors, list) or len(factors) == 0:
+            raise ValueError("The factors must be a non-empty list")
+        if not all(isinstance(factor, Factor) for factor in factors):
+            raise ValueError("The factors must be instances of the Factor class")
+        if any(factor._log_space for factor in factors):
+            raise TypeError("The factors must not be LogFactors; use LogFactor.product")
+        # 1. Check that the variable to sum out is in the product, and, as in
+        #    sum_out, that it is not the only variable in the product
+        if variable is not None:
+            if not any(variable in factor._scope_set for factor in factors):
+                raise ValueError("The variable to sum out is not in the factors")
+            if all(factor._scope_set <= {variable} for factor in factors):
+                raise ValueError("The variable to sum out is the only variable in the factors")
+
+        return Factor._product(factors, variable)
+
+    @staticmethod
+    def _product(factors: List['Factor'], variable: str = None) -> 'Factor':
+        """
+        Multiplies a list of factors together, as in product, but without
+        validating the inputs. This is intended for internal callers that
+        have already validated the factors, e.g. during variable elimination.
 
-        # Create new axes for broadcasting
-        self_extended_shape = [self.values.shape[self.scope.index(var)] if var in self.scope else 1 for var in new_scope]
-        other_extended_shape = [other.values.shape[other.scope.index(var)] if var in other.scope else 1 for var in new_scope]
+        If a variable is given, it is summed out of the product within the
+        same contraction, so that the full product is never materialised.
+        Unlike in product and sum_out, the variable may be the only variable
+        in the product, in which case the result has an empty scope; variable
+        elimination relies on this.
 
-        # Reshape the values arrays for broadcasting
-        self_values_reshaped = self.values.reshape(self_extended_shape)
-        other_values_reshaped = other.values.reshape(other_extended_shape)
+        Args:
+        - factors (List[Factor]): a non-empty list of factors to multiply
+        - variable (str): if provided, a variable to sum out of the product
 
-        # Multiply the reshaped arrays
-        new_values = self_values_reshaped * other_values_reshaped
+        Raises: None
 
-        return Factor(new_scope, new_values)
+        Returns: a new factor that is the product of all the factors, with the
+        variable summed out if one is given
+        """
+        # Combine the scopes, preserving the order of first appearance, and
+        # label each variable with an integer axis
+        labels = {}
+        size = 1
+        for factor in factors:
+            for var, cardinality in zip(factor.scope, factor.values.shape):
+                if var not in labels:
+                    labels[var] = len(labels)
+                    size *= cardinality
+        new_scope = [var for var in labels if var != variable]
+
+        # Let einsum align and broadcast every operand against the combined
+        # scope at once; any variable left out of the output labels is summed
+        # over within the same pass. einsum accepts up to 52 labels, and the
+        # combined scope is bounded by numpy's limit on array dimensions (32
+        # on the pinned numpy) plus at most the one variable summed out
+        operands = []
+        for factor in factors:
+            operands += [factor.values, [labels[var] for var in factor.scope]]
+        output = [labels[var] for var in new_scope]
+
+        # When summing a variable out of a large product of several factors,
+        # contract the factors pairwise along a (cached) path instead, which
+        # avoids looping over the full product
+        optimize = False
+        if variable is not None and len(factors) > 2 and size >= Factor.EINSUM_PATH_MIN_SIZE:
+            optimize = Factor._get_einsum_path(operands, output)
+        new_values = np.einsum(*operands, output, optimize=optimize)
+
+        # The product of a single factor is a view of its values, so copy it
+        # rather than share memory with the operand
+        if len(factors) == 1 and variable is None:
+            new_values = new_values.copy()
+
+        return Factor._unchecked(new_scope, np.asarray(new_values))
+
+    @staticmethod
+    def _align(factor: 'Factor', labels: dict[str, int]) -> np.ndarray:
+        """
+        Returns the values of a factor with its axes permuted and expanded to
+        broadcast against a combined scope.
+
+        Args:
+        - factor (Factor): a factor whose scope is a subset of the labels
+        - labels (dict[str, int]): a dictionary mapping each variable of the
+            combined scope to its axis
+
+        Raises: None
+
+        Returns: a view of the values of the factor, with one axis per
+        variable in the combined scope, of length 1 for the variables that are
+        not in the scope of the factor
+        """
+        order = sorted(range(len(factor.scope)), key=lambda axis: labels[factor.scope[axis]])
+        shape = [1] * len(labels)
+        for var, cardinality in zip(factor.scope, factor.values.shape):
+            shape[labels[var]] = cardinality
+        return np.transpose(factor.values, order).reshape(shape)
+
+    @staticmethod
+    def _get_einsum_path(operands: list, output: List[int]) -> list:
+        """
+        Returns a contraction path for an einsum call, in the form accepted by
+        its optimize argument.
+
+        The path depends only on the labels and shapes of the operands, so it
+        is computed once per combination and cached, evicting the oldest entry
+        if the cache is full.
+
+        Args:
+        - operands (list): the einsum operands in sublist format, i.e.
+            alternating arrays and lists of integer labels
+        - output (List[int]): the integer labels of the output
+
+        Raises: None
+
+        Returns: a contraction path, as returned by np.einsum_path
+        """
+        key = (
+            tuple((values.shape, tuple(sublist)) for values, sublist in zip(operands[::2], operands[1::2])),
+            tuple(output),
+        )
+        if key not in Factor._einsum_paths:
+            if len(Factor._einsum_paths) >= Factor.EINSUM_PATH_CACHE_SIZE:
+                del Factor._einsum_paths[next(iter(Factor._einsum_paths))]
+            Factor._einsum_paths[key] = np.einsum_path(*operands, output, optimize="greedy")[0]
+        return Factor._einsum_paths[key]
 
     def __mul__(self, other: 'Factor') -> 'Factor':
         """
@@ -134,32 +375,116 @@ class Factor:
         """
         return self.multiply(other)
 
-    # def sum_out(factor: Factor, variable: str) -> Factor:
-    #     """
-    #     Sums out a variable from a factor.
+    def reduce(self, assignments: dict[str, int]) -> 'Factor':
+        """
+        Reduces the factor by fixing some of its variables to observed values,
+        and returns a new factor over the remaining variables.
+
+        Assignments to variables that are not in the scope of the factor are
+        ignored, so that the same evidence can be applied to every factor.
+
+        Args:
+        - assignments (dict[str, int]): a dictionary of variable assignments
+
+        Raises:
+        - ValueError: if the assignments are not a dictionary of strings to integers
+        - ValueError: if the assignments are not within the cardinality of the variables
+
+        Returns: a new factor with the assigned variables removed from the scope
+        """
+        # Check validity of inputs
+        # 0. Check variable types
+        if not isinstance(assignments, dict):
+            raise ValueError("The assignments must be a dictionary")
+        if not all(isinstance(var, str) for var in assignments):
+            raise ValueError("The keys of the assignments must be strings")
+        if not all(isinstance(val, int) for val in assignments.values()):
+            raise ValueError("The values of the assignments must be integers")
+        # 1. Check that the assignments are within the cardinality of the variables
+        for variable_name, cardinality in zip(self.scope, self.values.shape):
+            if variable_name in assignments:
+                value = assignments[variable_name]
+                if value < 0 or value >= cardinality:
+                    raise ValueError(f"The value {value} is invalid for variable {variable_name}")
+
+        return self._reduce(assignments)
 
-    #     Args:
-    #     - factor (Factor): the factor to sum out
-    #     - variable (str): the variable to sum out
+    def _reduce(self, assignments: dict[str, int]) -> 'Factor':
+        """
+        Reduces the factor by fixing some of its variables to observed values,
+        as in reduce, but without validating the assignments. This is intended
+        for internal callers that have already validated the assignments, e.g.
+        when applying the evidence of a query to every factor.
+
+        Args:
+        - assignments (dict[str, int]): a dictionary of variable assignments
+
+        Raises: None
+
+        Returns: a new factor with the assigned variables removed from the scope
+        """
+        # Select the slice of the values array consistent with the assignments.
+        # The slice is generally a strided view, so it is copied into C order
+        indices = tuple(assignments[var] if var in assignments else slice(None) for var in self.scope)
+        new_values = np.copy(self.values[indices], order="C")
+
+        # Remove the assigned variables from the scope
+        new_scope = [var for var in self.scope if var not in assignments]
+
+        return self._unchecked(new_scope, new_values)
+
+    def normalise(self) -> 'Factor':
+        """
+        Normalises the factor, so that its values sum to 1.
+
+        Args: None
+
+        Raises:
+        - ValueError: if the values of the factor sum to zero
+
+        Returns: a new factor with the same scope and normalised values
+        """
+        # Check validity of inputs
+        # 0. Check that the factor can be normalised. The total is accumulated
+        #    in double precision, whatever the dtype of the values
+        total = np.sum(self.values, dtype=np.float64)
+        if total == 0:
+            raise ValueError("The factor cannot be normalised, as its values sum to zero")
+
+        return Factor._unchecked(list(self.scope), (self.values / total).astype(self.values.dtype, copy=False))
+
+    def sum_out(self, variable: str) -> 'Factor':
+        """
+        Sums out (marginalises) a variable from the factor, and returns a new
+        factor over the remaining variables.
 
-    #     Raises:
-    #     - ValueError: if the variable is not in the factor
-    #     - ValueError: if the variable is the only variable in the factor
+        The sum is taken over the variable's axis of the values array in a
+        single vectorised reduction.
 
-    #     Returns: a new factor with the variable summed out
-    #     """
-    #     # Check validity of inputs
-    #     # 0. Check that the variable is in the factor
-    #     if variable not in factor.scope:
-    #         raise ValueError("The variable to sum out is not in the factor")
+        Args:
+        - variable (str): the variable to sum out
+
+        Raises:
+        - ValueError: if the variable is not in the factor
+        - ValueError: if the variable is the only variable in the factor
+
+        Returns: a new factor with the variable summed out
+        """
+        # Check validity of inputs
+        # 0. Check that the variable is in the factor
+        if variable not in self._scope_set:
+            raise ValueError("The variable to sum out is not in the factor")
+        # 1. Check that the variable is not the only variable in the factor
+        if len(self.scope) == 1:
+            raise ValueError("The variable to sum out is the only variable in the factor")
 
-    #     # Find the index of the variable to sum out
-    #     variable_index = factor.scope.index(variable)
+        # Find the index of the variable to sum out
+        variable_index = self.scope.index(variable)
 
-    #     # Sum out the variable
-    #     new_probabilities = np.sum(factor.probabilities, axis=variable_index)
+        # Sum out the variable
+        new_values = np.sum(self.values, axis=variable_index)
 
-    #     # Remove the variable from the list of scope
-    #     new_scope = [var for var in factor.scope if var != variable]
+        # Remove the variable from the scope
+        new_scope = [var for var in self.scope if var != variable]
 
-    #     return Factor(new_scope, new_probabilities)
+        return Factor._unchecked(new_scope, new_values)
@@ -0,0 +1,256 @@
+from .factor import Factor
+
+import numpy as np
+
+from typing import List
+
+class LogFactor(Factor):
+    """
+    A factor whose values are stored as natural logarithms of
+    pseudo-probabilities.
+
+    Products of factors become sums of log-values, and summing out a variable
+    becomes a log-sum-exp, so that long chains of products do not underflow
+    to zero. This also makes narrower dtypes, such as np.float32, safe to use.
+
+    Attributes:
+    - scope (List[str]): an ordered list of variable names
+    - values (np.ndarray): a C-contiguous array of log-pseudo-probabilities,
+        where the shape is determined by the cardinality of the variables, and
+        impossible states are -inf
+
+    Methods:
+    - from_factor: returns the log-space representation of a factor
+    - to_factor: returns the linear-space representation of the factor
+    - evaluate: evaluates the (linear-space) factor given a set of assignments
+        to the variables
+    - evaluate_batch: evaluates the (linear-space) factor given a batch of
+        assignments to the variables
+    - multiply: multiplies the factor with another log factor and returns a
+        new log factor
+    - product: multiplies a list of log factors together, optionally summing
+        out a variable, and returns a new log factor
+    - reduce: fixes some variables to observed values and returns a new log factor
+    - sum_out: sums out a variable from the factor and returns a new log factor
+    - normalise: normalises the factor
+    """
+    _log_space = True
+
+    @classmethod
+    def from_factor(cls, factor: Factor) -> 'LogFactor':
+        """
+        Returns the log-space representation of a factor.
+
+        Args:
+        - factor (Factor): a factor, in linear space
+
+        Raises:
+        - ValueError: if the factor is not a Factor, or is already a LogFactor
+
+        Returns: a new log factor with the same scope, whose values are the
+        natural logarithms of the values of the factor
+        """
+        # Check validity of inputs
+        # 0. Check variable types
+        if not isinstance(factor, Factor) or isinstance(factor, LogFactor):
+            raise ValueError("The factor must be a Factor in linear space")
+
+        # Zero values map to -inf
+        with np.errstate(divide="ignore"):
+            return cls._unchecked(list(factor.scope), np.log(factor.values))
+
+    def to_factor(self) -> Factor:
+        """
+        Returns the linear-space representation of the factor.
+
+        Args: None
+
+        Raises: None
+
+        Returns: a new factor with the same scope, whose values are the
+        exponentials of the values of the log factor
+        """
+        return Factor._unchecked(list(self.scope), np.exp(self.values))
+
+    def evaluate(self, assignments: dict[str, int]) -> float:
+        """
+        Evaluates the factor given a set of assignments to the variables, in
+        linear space; see Factor.evaluate.
+        """
+        return np.exp(super().evaluate(assignments))
+
+    def evaluate_batch(self, assignments: dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Evaluates the factor given a batch of assignments to the variables, in
+        linear space; see Factor.evaluate_batch.
+        """
+        return np.exp(super().evaluate_batch(assignments))
+
+    def multiply(self, other: 'LogFactor') -> 'LogFactor':
+        """
+        Multiplies two log factors together, by adding their log-values, and
+        returns a new, composite log factor with a scope that is the union of
+        the scopes of the two factors.
+
+        Args:
+        - other (LogFactor): the other log factor to multiply
+
+        Raises:
+        - ValueError: if the other factor is not a Factor
+        - TypeError: if the other factor is a linear-space Factor
+
+        Returns: a new log factor that is the product of the two factors
+        """
+        # Check validity of inputs
+        # 0. Check that the other factor is a LogFactor
+        if not isinstance(other, Factor):
+            raise ValueError("The other factor must be a LogFactor")
+        if not isinstance(other, LogFactor):
+            raise TypeError("A LogFactor cannot be multiplied by a linear-space Factor")
+
+        return LogFactor._product([self, other])
+
+    @staticmethod
+    def product(factors: List['LogFactor'], variable: str = None) -> 'LogFactor':
+        """
+        Multiplies an arbitrary number of log factors together in a single
+        pass, and returns a new, composite log factor with a scope that is the
+        ordered union of the scopes of the factors. If a variable is given, it
+        is summed out of the product.
+
+        Args:
+        - factors (List[LogFactor]): a non-empty list of log factors to multiply
+        - variable (str): if provided, a variable to sum out of the product
+
+        Raises:
+        - ValueError: if the factors are not a non-empty list
+        - ValueError: if any of the factors is not a Factor
+        - TypeError: if any of the factors is a linear-space Factor
+        - ValueError: if the variable is not in the scope of any of the factors
+        - ValueError: if the variable is the only variable in the product
+
+        Returns: a new log factor that is the product of all the factors, with
+        the variable summed out if one is given
+        """
+        # Check validity of inputs
+        # 0. Check variable types
+        if not isinstance(factors, list) or len(factors) == 0:
+            raise ValueError("The factors must be a non-empty list")
+        if not all(isinstance(factor, Factor) for factor in factors):
+            raise ValueError("The factors must be instances of the LogFactor class")
+        if not all(isinstance(factor, LogFactor) for factor in factors):
+            raise TypeError("The factors must be LogFactors; use Factor.product")
+        # 1. Check that the variable to sum out is in the product, and, as in
+        #    sum_out, that it is not the only variable in the product
+        if variable is not None:
+            if not any(variable in factor._scope_set for factor in factors):
+                raise ValueError("The variable to sum out is not in the factors")
+            if all(factor._scope_set <= {variable} for factor in factors):
+                raise ValueError("The variable to sum out is the only variable in the factors")
+
+        return LogFactor._product(factors, variable)
+
+    @staticmethod
+    def _product(factors: List['LogFactor'], variable: str = None) -> 'LogFactor':
+        """
+        Multiplies a list of log factors together, as in product, but without
+        validating the inputs.
+
+        Args:
+        - factors (List[LogFactor]): a non-empty list of log factors to multiply
+        - variable (str): if provided, a variable to sum out of the product
+
+        Raises: None
+
+        Returns: a new log factor that is the product of all the factors, with
+        the variable summed out if one is given
+        """
+        # Combine the scopes, preserving the order of first appearance, and
+        # label each variable with an axis
+        labels = {}
+        for factor in factors:
+            for var in factor.scope:
+                if var not in labels:
+                    labels[var] = len(labels)
+        new_scope = list(labels)
+
+        # Align each operand's axes with the combined scope, and add them all
+        # with broadcasting
+        log_values = np.zeros((1,) * len(new_scope), dtype=np.result_type(*(factor.values for factor in factors)))
+        for factor in factors:
+            log_values = log_values + Factor._align(factor, labels)
+
+        if variable is None:
+            return LogFactor._unchecked(new_scope, log_values)
+        return LogFactor._unchecked(
+            [var for var in new_scope if var != variable],
+            LogFactor._logsumexp(log_values, labels[variable]),
+        )
+
+    def sum_out(self, variable: str) -> 'LogFactor':
+        """
+        Sums out (marginalises) a variable from the factor, with a log-sum-exp
+        over the variable's axis, and returns a new log factor over the
+        remaining variables.
+
+        Args:
+        - variable (str): the variable to sum out
+
+        Raises:
+        - ValueError: if the variable is not in the factor
+        - ValueError: if the variable is the only variable in the factor
+
+        Returns: a new log factor with the variable summed out
+        """
+        # Check validity of inputs
+        # 0. Check that the variable is in the factor
+        if variable not in self._scope_set:
+            raise ValueError("The variable to sum out is not in the factor")
+        # 1. Check that the variable is not the only variable in the factor
+        if len(self.scope) == 1:
+            raise ValueError("The variable to sum out is the only variable in the factor")
+
+        new_values = LogFactor._logsumexp(self.values, self.scope.index(variable))
+        new_scope = [var for var in self.scope if var != variable]
+
+        return LogFactor._unchecked(new_scope, new_values)
+
+    def normalise(self) -> 'LogFactor':
+        """
+        Normalises the factor, so that its linear-space values sum to 1.
+
+        Args: None
+
+        Raises:
+        - ValueError: if the linear-space values of the factor sum to zero
+
+        Returns: a new log factor with the same scope and normalised values
+        """
+        # Check validity of inputs
+        # 0. Check that the factor can be normalised
+        log_total = LogFactor._logsumexp(self.values.reshape(-1), 0)
+        if log_total == -np.inf:
+            raise ValueError("The factor cannot be normalised, as its values sum to zero")
+
+        return LogFactor._unchecked(list(self.scope), self.values - log_total)
+
+    @staticmethod
+    def _logsumexp(log_values: np.ndarray, axis: int) -> np.ndarray:
+        """
+        Computes log(sum(exp(log_values))) along an axis, shifting by the
+        maximum so that the exponentials neither overflow nor underflow.
+
+        Args:
+        - log_values (np.ndarray): an array of log-values
+        - axis (int): the axis along which to sum
+
+        Raises: None
+
+        Returns: an array with the axis removed
+        """
+        maximum = np.max(log_values, axis=axis, keepdims=True)
+        # Slices that are entirely -inf would otherwise give nan
+        maximum[~np.isfinite(maximum)] = 0
+        with np.errstate(divide="ignore"):
+            result = np.log(np.sum(np.exp(log_values - maximum), axis=axis)) + np.squeeze(maximum, axis=axis)
+        return np.asarray(result, dtype=log_values.dtype)
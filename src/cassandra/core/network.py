@@ -1,5 +1,10 @@
 from .node import Node
+from .factor import Factor
+from .algorithms import sum_product_eliminate
 
+import numpy as np
+
+from collections import deque
 from typing import List
 
 class Network:
@@ -19,11 +24,21 @@ class Network:
         the network
     - evaluate_joint_probability: evaluates the joint probability of the network, given a
         full suite of evidence variables
+    - evaluate_log_joint_probability: evaluates the log joint probability of the
+        network, given a full suite of evidence variables
+    - evaluate_joint_probability_batch: evaluates the joint probability of the
+        network for a batch of full suites of evidence variables
+    - query: evaluates a conditional probability query on the network, using
+        variable elimination
 
     """
+    # The maximum number of query results, and of query plans, to cache
+    QUERY_CACHE_SIZE = 128
+
     def __init__(
             self,
-            nodes: List
+            nodes: List,
+            dtype: type = np.float64
         ) -> None:
         """
         Initializes a Bayesian network, composed of nodes.
@@ -34,19 +49,24 @@ class Network:
 
         Args:
         - nodes (List[Node]): a list of nodes in the Bayesian network
+        - dtype (type): the floating point type in which the factors used for
+            inference are stored; np.float32 halves their memory, at the cost
+            of precision
 
         Raises:
         - ValueError: if the nodes are not a list
         - ValueError: if the nodes are not instances of the Node class
         - ValueError: if the nodes are not unique
+        - ValueError: if the variable names of the nodes are not unique
         - ValueError: if the network is not closed
         - ValueError: if the network is not a directed acyclic graph
+        - ValueError: if the dtype is not a floating point type
 
         Returns: None
 
         Attributes:
         - nodes (Dict[str, Node]): a dictionary of nodes in the network, where
-            the keys are the variable names of the nodes.
+            the keys are the variable names of the nodes, in topological order.
         """
 
         # Check validity of inputs
@@ -55,18 +75,83 @@ class Network:
             raise ValueError("The nodes must be a list")
         if not all(isinstance(node, Node) for node in nodes):
             raise ValueError("The nodes must be instances of the Node class")
-        # 1. Check that the nodes are unique
-        if len(set(nodes)) != len(nodes):
+        if not np.issubdtype(dtype, np.floating):
+            raise ValueError("The dtype must be a floating point type")
+        # 1. Check that the nodes, and their variable names, are unique
+        node_set = set(nodes)
+        if len(node_set) != len(nodes):
             raise ValueError("The nodes must be unique")
+        if len(set(node.variable_name for node in nodes)) != len(nodes):
+            raise ValueError("The variable names of the nodes must be unique")
         # 2. Check that the network is closed
         for node in nodes:
             for parent_node in node.parent_nodes:
-                if parent_node not in nodes:
+                if parent_node not in node_set:
                     raise ValueError("The network is not closed")
-        # 3. Check that the network is a directed acyclic graph
-        # TODO: Implement this check
+        # 3. Check that the network is a directed acyclic graph, by attempting
+        #    to topologically sort the nodes (Kahn's algorithm); any nodes left
+        #    unsorted must lie on a cycle
+        in_degrees = {node: len(node.parent_nodes) for node in nodes}
+        child_nodes = {node: [] for node in nodes}
+        for node in nodes:
+            for parent_node in node.parent_nodes:
+                child_nodes[parent_node].append(node)
+        frontier = deque(node for node in nodes if in_degrees[node] == 0)
+        ordered_nodes = []
+        while frontier:
+            node = frontier.popleft()
+            ordered_nodes.append(node)
+            for child_node in child_nodes[node]:
+                in_degrees[child_node] -= 1
+                if in_degrees[child_node] == 0:
+                    frontier.append(child_node)
+        if len(ordered_nodes) != len(nodes):
+            raise ValueError("The network is not a directed acyclic graph")
+
+        # Store the nodes, and everything derived from them below, in the
+        # topological order found above, so that every parent precedes its
+        # children wherever the network is iterated
+        self._ordered_nodes = tuple(ordered_nodes)
+        self.nodes = { node.variable_name: node for node in self._ordered_nodes }
+
+        # Precompute the set of variable names used to validate evidence and
+        # queries, rather than rebuilding it on every call
+        self._variable_names = frozenset(self.nodes)
+
+        # Intern each variable name to a small integer index, in topological
+        # order, so that sets of variables can be held as integer bitmasks
+        self._variable_indices = { variable_name: index for index, variable_name in enumerate(self.nodes) }
+        self._variable_names_by_index = tuple(self.nodes)
+
+        # The family of each node, i.e. the node and its parents, as a bitmask
+        # over the variable indices; these are the cliques of the moral graph,
+        # used to compute elimination orderings
+        self._family_masks = {
+            node.variable_name: sum(
+                1 << self._variable_indices[variable_name]
+                for variable_name in (node.variable_name,) + node.parent_variable_names
+            )
+            for node in self._ordered_nodes
+        }
+
+        # The network is fixed once constructed, so its factorisation can be
+        # built once here and reused across queries
+        self._factors = { node.variable_name: node.to_factor(dtype) for node in self._ordered_nodes }
+
+        # Query plans (relevant variables and elimination orderings), keyed by
+        # the query and evidence variables; see _get_query_plan
+        self._query_plans = {}
+
+        # Results of previous queries, keyed by the query variables and the
+        # evidence assignment
+        self._query_results = {}
 
-        self.nodes = { node.variable_name: node for node in nodes }
+        # Pair each node with the variable names that index its CPD, i.e. its
+        # parents followed by itself, so that evaluating the joint is a fixed
+        # sequence of lookups
+        self._cpd_variable_names = tuple(
+            (node, node.parent_variable_names + (node.variable_name,)) for node in self._ordered_nodes
+        )
 
     def get_cardinality(self) -> int:
         """
@@ -91,7 +176,7 @@ class Network:
         Returns: a set of strings representing the variable names of the nodes
 
         """
-        return set([node for node in self.nodes.keys()])
+        return set(self.nodes)
 
     def evaluate_joint_probability(self, e: dict[str, int]) -> float:
         """
@@ -104,35 +189,135 @@ class Network:
         Raises:
         - ValueError: if the evidence variables are not a dictionary
         - ValueError: if the evidence variables are not complete
+        - ValueError: if the evidence observations are not valid integer states
 
         Returns: a float representing the joint probability of the network
         """
 
+        # Check validity of inputs
+        self._validate_complete_evidence(e)
+
+        # Compute the joint probability. The evidence has been fully validated
+        # above, so each CPD can be indexed positionally, without building a
+        # dictionary of parent assignments for every node
+        prob = 1
+        for node, cpd_variable_names in self._cpd_variable_names:
+            prob *= node.cpd[tuple(map(e.__getitem__, cpd_variable_names))]
+
+        return prob
+
+    def evaluate_log_joint_probability(self, e: dict[str, int]) -> float:
+        """
+        Evaluates the natural logarithm of the joint probability of the
+        network, given a full suite of evidence variables.
+
+        The log-probabilities of the nodes are summed rather than their
+        probabilities multiplied, which avoids underflow in large networks.
+
+        Args:
+        - e (Dict[str, int]): a dictionary of all variables and their values
+
+        Raises:
+        - ValueError: if the evidence variables are not a dictionary
+        - ValueError: if the evidence variables are not complete
+        - ValueError: if the evidence observations are not valid integer states
+
+        Returns: a float representing the log joint probability of the network,
+        which is -inf if the assignment has zero probability
+        """
+
+        # Check validity of inputs
+        self._validate_complete_evidence(e)
+
+        # Compute the log joint probability, taking the logarithm of each
+        # looked-up probability rather than of the whole CPD; impossible states
+        # map to -inf
+        log_prob = 0.0
+        with np.errstate(divide="ignore"):
+            for node, cpd_variable_names in self._cpd_variable_names:
+                log_prob += np.log(node.cpd[tuple(map(e.__getitem__, cpd_variable_names))])
+
+        return log_prob
+
+    def evaluate_joint_probability_batch(self, e: dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Evaluates the joint probability of the network for a batch of full
+        suites of evidence variables, in one vectorised lookup per node.
+
+        Args:
+        - e (Dict[str, np.ndarray]): a dictionary mapping every variable to a
+            1-dimensional integer array of values, where all arrays have the
+            same length
+
+        Raises:
+        - TypeError: if the evidence variables are not a dictionary
+        - ValueError: if the evidence variables are not complete
+        - ValueError: if there are no evidence variables, i.e. the network is empty
+        - ValueError: if the evidence observations are not integer arrays
+        - ValueError: if the arrays of observations do not have the same length
+        - ValueError: if the evidence observations are not valid states
+
+        Returns: a 1-dimensional array of the joint probabilities of the
+        network, one per assignment in the batch
+        """
         # Check validity of inputs
         # 0. Check variable types
         if not isinstance(e, dict):
             raise TypeError("The evidence variables must be a dictionary")
         # 1. Check that the evidence variables are complete
-        if set(e.keys()) != self.get_variable_names():
+        if e.keys() != self._variable_names:
             raise ValueError("The evidence variables must be complete")
-        # 2. Check that the evidence observations are valid
+        if len(e) == 0:
+            raise ValueError("The evidence variables must not be empty")
+        # 2. Check that the evidence observations are integer arrays of the
+        #    same length
+        if not all(isinstance(value, np.ndarray) and np.issubdtype(value.dtype, np.integer) for value in e.values()):
+            raise ValueError("The evidence observations must be integer arrays")
+        if len(set(value.shape for value in e.values())) > 1 or any(value.ndim != 1 for value in e.values()):
+            raise ValueError("The evidence observations must be 1-dimensional arrays of the same length")
+        # 3. Check that the evidence observations are valid
         for variable_name, value in e.items():
-            if value < 0 or value >= self.nodes[variable_name].get_cardinality():
+            if np.any((value < 0) | (value >= self.nodes[variable_name].get_cardinality())):
                 raise ValueError("The evidence observations are invalid")
 
-        # Compute the joint probability
-        prob = 1
-        for variable_name, node in self.nodes.items():
-            parent_variable_names = [parent_node.variable_name for parent_node in node.parent_nodes]
-            conditional_probability = node.compute_conditional_probability(
-                e[variable_name],
-                { parent_variable_name: e[parent_variable_name] for parent_variable_name in parent_variable_names }
-            )
-            prob *= conditional_probability
+        # Compute the joint probabilities, gathering the probabilities of all
+        # the assignments in the batch from each CPD at once
+        n_assignments = next(iter(e.values())).shape[0]
+        prob = np.ones(n_assignments)
+        for node, cpd_variable_names in self._cpd_variable_names:
+            prob *= node.cpd[tuple(map(e.__getitem__, cpd_variable_names))]
 
         return prob
 
-    def query(self, Y, e):
+    def _validate_complete_evidence(self, e: dict[str, int]) -> None:
+        """
+        Validates a full suite of evidence variables, i.e. an assignment of a
+        state to every variable in the network.
+
+        Args:
+        - e (Dict[str, int]): a dictionary of all variables and their values
+
+        Raises:
+        - TypeError: if the evidence variables are not a dictionary
+        - ValueError: if the evidence variables are not complete
+        - ValueError: if the evidence observations are not valid integer states
+
+        Returns: None
+        """
+        # 0. Check variable types
+        if not isinstance(e, dict):
+            raise TypeError("The evidence variables must be a dictionary")
+        # 1. Check that the evidence variables are complete
+        if e.keys() != self._variable_names:
+            raise ValueError("The evidence variables must be complete")
+        # 2. Check that the evidence observations are valid
+        for variable_name, value in e.items():
+            if not isinstance(value, int):
+                raise ValueError("The evidence observations must be integers")
+            if value < 0 or value >= self.nodes[variable_name].get_cardinality():
+                raise ValueError("The evidence observations are invalid")
+
+    def query(self, Y: set[str], e: dict[str, int]) -> Factor:
         """
         Evaluates a conditional probability query on the network, using the
         variable elimination algorithm.
@@ -141,10 +326,18 @@ class Network:
         - Y (Set[str]): a set of variable names to query
         - e (Dict[str, int]): a dictionary of evidence variables and their values
 
-        Raises: None
-
-        Returns: a dictionary where the keys are the variable names of the query
-        and the values are the probabilities of the query variables.
+        Raises:
+        - TypeError: if the query variables are not a set
+        - TypeError: if the evidence variables are not a dictionary
+        - ValueError: if there are no query variables
+        - ValueError: if the query and evidence variables overlap
+        - ValueError: if the query or evidence variables are not in the network
+        - ValueError: if the evidence observations are not valid integer states
+        - ValueError: if the evidence has zero probability
+
+        Returns: a normalised factor over the query variables, representing the
+        conditional distribution P(Y | e). Results are cached, so repeated
+        queries return factors that share the same read-only values.
         """
 
         # Check validity of inputs
@@ -157,18 +350,226 @@ class Network:
         if len(Y) == 0:
             raise ValueError("There must be at least one query variable")
         # 2. Check that there is no overlap between query and evidence variables
-        if len(Y.intersection(e.keys())) > 0:
+        if not Y.isdisjoint(e):
             raise ValueError("The query and evidence variables must be disjoint")
         # 3. Check that the union of the query and evidence variables is a subset
         # of the network's variable names
-        if not Y.union(e.keys()).issubset(self.get_variable_names()):
+        if not self._variable_names.issuperset(Y) or not self._variable_names.issuperset(e):
             raise ValueError("The query and evidence variables must be a subset of the network")
+        # 4. Check that the evidence observations are valid
+        for variable_name, value in e.items():
+            if not isinstance(value, int):
+                raise ValueError("The evidence observations must be integers")
+            if value < 0 or value >= self.nodes[variable_name].get_cardinality():
+                raise ValueError("The evidence observations are invalid")
 
-        # Compute an elimination ordering
-
+        # Return the cached result if this exact query has been evaluated
+        # before, wrapped in a new factor so that callers cannot modify the
+        # cached one
+        key = (frozenset(Y), frozenset(e.items()))
+        if key in self._query_results:
+            cached = self._query_results[key]
+            return Factor._unchecked(list(cached.scope), cached.values)
+
+        # Prune the barren variables, and compute an elimination ordering
+        relevant_variable_names, elimination_ordering = self._get_query_plan(Y, e)
+
+        # Apply the evidence to the factors up front, so that the evidence
+        # variables are removed from their scopes before any products are taken.
+        # The evidence has been validated above, so it is not re-validated for
+        # every factor
+        factors = [
+            factor if factor._scope_set.isdisjoint(e) else factor._reduce(e)
+            for factor in self._get_joint_factorisation(relevant_variable_names)
+        ]
 
         # Eliminate variables in the elimination ordering
+        for variable_name in elimination_ordering:
+            factors = sum_product_eliminate(factors, variable_name)
+
+        # Multiply the remaining factors, which are over the query variables only
+        phi = Factor._product(factors)
+
+        # Normalise to obtain the conditional distribution. The normalising
+        # constant is the probability of the evidence, and is computed once for
+        # both the zero-probability check and the division. It is accumulated in
+        # double precision, whatever the dtype of the factors
+        alpha = np.sum(phi.values, dtype=np.float64)
+        if alpha == 0:
+            raise ValueError("The evidence has zero probability")
+        result = Factor._unchecked(phi.scope, (phi.values / alpha).astype(phi.values.dtype, copy=False))
+
+        # Cache the result, evicting the oldest entry if the cache is full. The
+        # values are made read-only, since they are shared by every caller of
+        # this query, and the caller receives a new factor rather than the
+        # cached one
+        result.values.flags.writeable = False
+        self._add_to_cache(self._query_results, key, result)
+
+        return Factor._unchecked(list(result.scope), result.values)
+
+    def _get_query_plan(self, Y: set[str], e: dict[str, int]) -> tuple:
+        """
+        Returns the variables relevant to a query and the order in which to
+        eliminate them.
 
-        prob = 0
-        return prob
+        The barren variables, i.e. those that are not ancestors of a query or
+        evidence variable, are pruned; their factors sum to one when
+        eliminated, so they cannot affect the result. The plan depends only on
+        which variables are queried and observed, not on the observed values,
+        so it is cached, up to QUERY_CACHE_SIZE plans, and reused across
+        queries.
 
+        Args:
+        - Y (Set[str]): a set of variable names to query
+        - e (Dict[str, int]): a dictionary of evidence variables and their values
+
+        Raises: None
+
+        Returns: a tuple of the set of relevant variable names, and a list of
+        the variable names to eliminate, in elimination order
+        """
+        key = (frozenset(Y), frozenset(e))
+        if key not in self._query_plans:
+            relevant_variable_names = self._get_ancestral_variable_names(Y.union(e))
+            elimination_ordering = self._get_elimination_ordering(
+                relevant_variable_names.difference(Y, e), e, relevant_variable_names
+            )
+            self._add_to_cache(
+                self._query_plans, key, (frozenset(relevant_variable_names), tuple(elimination_ordering))
+            )
+        return self._query_plans[key]
+
+    def _add_to_cache(self, cache: dict, key, value) -> None:
+        """
+        Adds an entry to one of the network's caches, evicting the oldest
+        entry first if the cache already holds QUERY_CACHE_SIZE entries.
+
+        Args:
+        - cache (dict): the cache to add the entry to
+        - key: the key of the entry
+        - value: the value of the entry
+
+        Raises: None
+
+        Returns: None
+        """
+        if len(cache) >= self.QUERY_CACHE_SIZE:
+            del cache[next(iter(cache))]
+        cache[key] = value
+
+    def _get_joint_factorisation(self, variable_names: set[str] = None) -> List[Factor]:
+        """
+        Returns the factorisation of the joint distribution of the network,
+        i.e. one factor per node, corresponding to the node's CPD.
+
+        The factors are built once, when the network is constructed; a new
+        list is returned on each call, so that callers may modify it freely.
+
+        Args:
+        - variable_names (Set[str]): if provided, only the factors of the nodes
+            with these variable names are returned
+
+        Raises: None
+
+        Returns: a list of factors, one per (selected) node in the network
+        """
+        if variable_names is None:
+            return list(self._factors.values())
+        return [factor for variable_name, factor in self._factors.items() if variable_name in variable_names]
+
+    def _get_ancestral_variable_names(self, variable_names: set[str]) -> set[str]:
+        """
+        Returns the given variable names together with the variable names of
+        all of their ancestors in the network.
+
+        Args:
+        - variable_names (Set[str]): a set of variable names in the network
+
+        Raises: None
+
+        Returns: a set of variable names, closed under taking parents
+        """
+        ancestral_variable_names = set()
+        frontier = list(variable_names)
+        while frontier:
+            variable_name = frontier.pop()
+            if variable_name not in ancestral_variable_names:
+                ancestral_variable_names.add(variable_name)
+                frontier.extend(self.nodes[variable_name].parent_variable_names)
+        return ancestral_variable_names
+
+    def _get_elimination_ordering(self, Z: set[str], e: dict[str, int], variable_names: set[str] = None) -> List[str]:
+        """
+        Computes an ordering in which to eliminate variables, using the greedy
+        min-fill heuristic over the moral graph of the network.
+
+        At each step, the variable whose elimination would add the fewest
+        edges between its (not yet eliminated) neighbours is chosen, which
+        keeps the scopes of the intermediate factors small. Ties are broken by
+        variable name, so that the ordering is deterministic.
+
+        Args:
+        - Z (Set[str]): a set of variable names to eliminate
+        - e (Dict[str, int]): a dictionary of evidence variables and their
+            values; these are fixed rather than eliminated, and so are
+            excluded from the graph
+        - variable_names (Set[str]): if provided, only the nodes with these
+            variable names take part in elimination, and the graph is built
+            from their families alone; this set must be closed under taking
+            parents
+
+        Raises: None
+
+        Returns: a list of the variable names in Z, in elimination order
+        """
+        def get_indices(mask: int) -> List[int]:
+            indices = []
+            while mask:
+                lowest_bit = mask & -mask
+                indices.append(lowest_bit.bit_length() - 1)
+                mask ^= lowest_bit
+            return indices
+
+        # Build the moral graph, in which each node is connected to its parents
+        # and the parents of each node are connected to each other. The
+        # neighbours of each variable are held as a bitmask over the variable
+        # indices, so that set operations are single integer operations. The
+        # families are precomputed, so the evidence variables are masked out
+        if variable_names is None:
+            variable_names = self._variable_names
+        variable_indices = self._variable_indices
+        variable_names_by_index = self._variable_names_by_index
+        evidence_mask = sum(1 << variable_indices[variable_name] for variable_name in e)
+        neighbours = {
+            variable_indices[variable_name]: 0
+            for variable_name in variable_names
+            if variable_name not in e
+        }
+        for variable_name, family in self._family_masks.items():
+            if variable_name not in variable_names:
+                continue
+            family &= ~evidence_mask
+            for index in get_indices(family):
+                neighbours[index] |= family & ~(1 << index)
+
+        def count_fill_edges(index: int) -> int:
+            # Each missing edge between two neighbours is seen from both ends
+            variable_neighbours = neighbours[index]
+            return sum(
+                bin(variable_neighbours & ~neighbours[neighbour] & ~(1 << neighbour)).count("1")
+                for neighbour in get_indices(variable_neighbours)
+            ) // 2
+
+        # Greedily eliminate the variable that adds the fewest fill edges
+        ordering = []
+        remaining = {variable_indices[variable_name] for variable_name in Z}
+        while remaining:
+            index = min(remaining, key=lambda index: (count_fill_edges(index), variable_names_by_index[index]))
+            variable_neighbours = neighbours.pop(index)
+            for neighbour in get_indices(variable_neighbours):
+                neighbours[neighbour] = (neighbours[neighbour] | variable_neighbours) & ~(1 << neighbour) & ~(1 << index)
+            ordering.append(variable_names_by_index[index])
+            remaining.remove(index)
+
+        return ordering
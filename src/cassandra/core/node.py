@@ -18,6 +18,8 @@ class Node:
     - variable_name (str): the name of the variable
     - parent_nodes (List[Node]): a ordered list of parent nodes, aligned with the
         dimensions of the CPD
+    - parent_variable_names (Tuple[str]): the variable names of the parent
+        nodes, in the same order as parent_nodes
     - cpd (np.Array): a (N+1)-dimensional numpy array representing the
         conditional probability distribution associated with the node, where
         each dimension N corresponds to a parent node and the last dimension
@@ -29,6 +31,9 @@ class Node:
         given an assignment of observed states of all the parent variables
     - compute_conditional_probability: computes the conditional probability of the variable,
         given an assignment of parent variables and a particular state of the variable
+    - compute_conditional_probability_batch: computes the conditional probabilities of a
+        batch of states of the variable, each given an assignment of parent variables
+    - to_factor: returns a factor representation of the node
 
     """
     def __init__(
@@ -97,6 +102,12 @@ class Node:
         self.parent_nodes = parent_nodes
         self.cpd = cpd
 
+        # Precompute the parent metadata used to validate assignments, so that
+        # it is built once here rather than on every lookup
+        self.parent_variable_names = tuple(node.variable_name for node in parent_nodes)
+        self._parent_variable_name_set = frozenset(self.parent_variable_names)
+        self._parent_cardinalities = {node.variable_name: node.get_cardinality() for node in parent_nodes}
+
     def __repr__(self):
         return """
         Variable name: {}
@@ -135,28 +146,45 @@ class Node:
         Returns: a (cardinality,) numpy array representing the conditional
         distribution of the variable, given the parent observations.
         """
+        # Get the conditional distribution, i.e. index into the CPD
+        return self.cpd[self._get_parent_indices(parent_variable_assignment)]
+
+    def _get_parent_indices(self, parent_variable_assignment: dict[str, int]) -> tuple:
+        """
+        Validates an assignment of observed states of all the parent variables,
+        and converts it into a tuple of indices aligned with the leading
+        dimensions of the CPD.
+
+        Args:
+        - parent_variable_assignment (dict): a dictionary where the keys are the
+            names of the parent nodes and the values are the indices of the
+            observed states of these parent nodes.
+
+        Raises:
+        - ValueError: if the parent nodes are not provided
+        - ValueError: if the parent nodes are not valid
+        - ValueError: if the parent nodes are not integers
+
+        Returns: a tuple of integers, one per parent node
+        """
         # Validate inputs
         # 0. Check all inputs are integers
         if not all(map(lambda x: isinstance(x, int), parent_variable_assignment.values())):
             raise ValueError("All inputs should be integers")
 
         # 1. Check that all parent nodes are provided
-        if set(parent_variable_assignment.keys()) != set(map(lambda x: x.variable_name, self.parent_nodes)):
+        if parent_variable_assignment.keys() != self._parent_variable_name_set:
             raise ValueError("Not all parent nodes are provided")
 
         # 2. Check that the provided states are valid, i.e. the integers are
         #    within the range of the number of states of the parent nodes
-        parent_node_cardinalities = {node.variable_name: node.get_cardinality() for node in self.parent_nodes}
         for item in parent_variable_assignment.items():
             variable_name, provided_index = item
-            if provided_index < 0 or provided_index >= parent_node_cardinalities[variable_name]:
+            if provided_index < 0 or provided_index >= self._parent_cardinalities[variable_name]:
                 raise ValueError(f"The state {provided_index} of parent node {variable_name} is invalid; it exceeds the number of states of the parent node")
 
         # Construct the correct order of the indices
-        indices = tuple(map(lambda node: parent_variable_assignment[node.variable_name], self.parent_nodes))
-
-        # Get the conditional distribution, i.e. index into the CPD
-        return self.cpd[indices]
+        return tuple(parent_variable_assignment[variable_name] for variable_name in self.parent_variable_names)
 
     def compute_conditional_probability(self, variable_assignment: int, parent_variable_assignments: dict[str, int]) -> float:
         """
@@ -183,15 +211,74 @@ class Node:
         if variable_assignment < 0 or variable_assignment >= self.get_cardinality():
             raise ValueError(f"The variable assignment {variable_assignment} is invalid; it exceeds the number of states of the variable")
 
-        return self.get_conditional_distribution(parent_variable_assignments)[variable_assignment]
+        # Index directly into the CPD with a single, full index tuple, rather
+        # than materialising the conditional distribution and indexing again
+        return self.cpd[self._get_parent_indices(parent_variable_assignments) + (variable_assignment,)]
 
-    def to_factor(self) -> Factor:
+    def compute_conditional_probability_batch(self, variable_assignments: np.ndarray, parent_variable_assignments: dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Computes the conditional probabilities of a batch of states of the
+        variable, each given an assignment of parent variables, in a single
+        vectorised lookup.
+
+        Args:
+        - variable_assignments (np.ndarray): a 1-dimensional integer array of
+            states of the variable
+        - parent_variable_assignments (dict[str, np.ndarray]): a dictionary
+            where the keys are the names of the parent nodes and the values
+            are 1-dimensional integer arrays of the observed states of these
+            parent nodes, aligned with variable_assignments
+
+        Raises:
+        - ValueError: if the assignments are not integer arrays
+        - ValueError: if not all parent nodes are provided
+        - ValueError: if the arrays are not 1-dimensional and of the same length
+        - ValueError: if the assignments are not valid states
+
+        Returns: a 1-dimensional array of the conditional probabilities, one
+        per assignment in the batch
+        """
+        # Validate inputs
+        # 0. Check that all inputs are integer arrays
+        arrays = [variable_assignments] + list(parent_variable_assignments.values())
+        if not all(isinstance(array, np.ndarray) and np.issubdtype(array.dtype, np.integer) for array in arrays):
+            raise ValueError("All inputs should be integer arrays")
+        # 1. Check that all parent nodes are provided
+        if parent_variable_assignments.keys() != self._parent_variable_name_set:
+            raise ValueError("Not all parent nodes are provided")
+        # 2. Check that the arrays are 1-dimensional and of the same length
+        if len(set(array.shape for array in arrays)) > 1 or variable_assignments.ndim != 1:
+            raise ValueError("The assignments must be 1-dimensional arrays of the same length")
+        # 3. Check that the provided states are valid
+        if np.any((variable_assignments < 0) | (variable_assignments >= self.get_cardinality())):
+            raise ValueError("The variable assignments are invalid; they exceed the number of states of the variable")
+        for variable_name, provided_indices in parent_variable_assignments.items():
+            if np.any((provided_indices < 0) | (provided_indices >= self._parent_cardinalities[variable_name])):
+                raise ValueError(f"The states of parent node {variable_name} are invalid; they exceed the number of states of the parent node")
+
+        # Gather all the probabilities from the CPD at once
+        parent_indices = tuple(parent_variable_assignments[variable_name] for variable_name in self.parent_variable_names)
+        return self.cpd[parent_indices + (variable_assignments,)]
+
+    def to_factor(self, dtype: type = np.float64) -> Factor:
         """
         Returns an abstract factor representation of the node.
 
-        Args: None
+        Args:
+        - dtype (type): the floating point type in which to store the values of
+            the factor; narrower types such as np.float32 halve the memory used
 
-        Raises: None
+        Raises:
+        - ValueError: if the dtype is not a floating point type
 
-        Returns: a Factor representation of the node
+        Returns: a Factor representation of the node, whose scope is the
+        parent variables followed by the variable itself, aligned with the
+        dimensions of the CPD
         """
+        # Validate inputs
+        # 0. Check that the dtype is a floating point type
+        if not np.issubdtype(dtype, np.floating):
+            raise ValueError("The dtype must be a floating point type")
+
+        scope = list(self.parent_variable_names) + [self.variable_name]
+        return Factor(scope, np.asarray(self.cpd, dtype=dtype))
@@ -0,0 +1,44 @@
+import pytest
+import numpy as np
+
+from cassandra.core import Factor
+from cassandra.core.algorithms import sum_product_eliminate
+
+@pytest.fixture
+def chain_factors():
+    # tau(A), tau(A, B), tau(B, C)
+    return [
+        Factor(['A'], np.array([0.6, 0.4])),
+        Factor(['A', 'B'], np.array([[0.7, 0.3], [0.2, 0.8]])),
+        Factor(['B', 'C'], np.array([[0.9, 0.1], [0.5, 0.5]]))
+    ]
+
+# sum_product_eliminate
+## validation
+def test_sum_product_eliminate_invalid_factors():
+    with pytest.raises(ValueError, match="The factors must be a list"):
+        sum_product_eliminate('factors', 'A')
+
+def test_sum_product_eliminate_invalid_factor_types(chain_factors):
+    with pytest.raises(ValueError, match="The factors must be instances of the Factor class"):
+        sum_product_eliminate(chain_factors + ['factor'], 'A')
+
+## correctness
+def test_sum_product_eliminate_irrelevant_variable(chain_factors):
+    result = sum_product_eliminate(chain_factors, 'D')
+    assert result == chain_factors
+
+def test_sum_product_eliminate_simple(chain_factors):
+    result = sum_product_eliminate(chain_factors, 'A')
+    assert len(result) == 2
+    assert result[0] is chain_factors[2]
+    # tau(B) = sum_A P(A) P(B|A) = P(B)
+    assert result[1].scope == ['B']
+    np.testing.assert_array_almost_equal(result[1].values, np.array([0.5, 0.5]))
+
+def test_sum_product_eliminate_to_constant():
+    factors = [Factor(['A'], np.array([0.6, 0.4]))]
+    result = sum_product_eliminate(factors, 'A')
+    assert len(result) == 1
+    assert result[0].scope == []
+    assert np.isclose(result[0].values, 1.0)
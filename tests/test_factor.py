@@ -37,6 +37,26 @@ def test_init_probabilities_wrong_shape():
     with pytest.raises(ValueError):
         Factor(['A', 'B'], np.array([0.1, 0.9]))
 
+## correctness
+def test_init_values_c_contiguous():
+    values = np.array([[0.1, 0.2], [0.3, 0.4]])
+    assert Factor(['A', 'B'], values).values is values
+    transposed = Factor(['B', 'A'], values.T)
+    assert transposed.values.flags.c_contiguous
+    np.testing.assert_array_equal(transposed.values, values.T)
+
+# _unchecked
+def test_unchecked_matches_init(simple_factor):
+    factor = Factor._unchecked(['A', 'B'], simple_factor.values)
+    assert factor.scope == simple_factor.scope
+    assert factor._scope_set == simple_factor._scope_set
+    np.testing.assert_array_equal(factor.values, simple_factor.values)
+
+def test_unchecked_values_c_contiguous(simple_factor):
+    factor = Factor._unchecked(['B', 'A'], simple_factor.values.T)
+    assert factor.values.flags.c_contiguous
+    np.testing.assert_array_equal(factor.values, simple_factor.values.T)
+
 # evaluate
 ## validation
 def test_evaluate_invalid_assignment_type(simple_factor):
@@ -72,6 +92,37 @@ def test_evaluate_simple():
     factor = Factor(['A', 'B'], np.array([[0.1, 0.2], [0.3, 0.4]]))
     assert factor.evaluate({'A': 0, 'B': 0}) == 0.1
 
+# evaluate_batch
+## validation
+def test_evaluate_batch_invalid_assignment_type(simple_factor):
+    with pytest.raises(ValueError, match="The assignments must be a dictionary"):
+        simple_factor.evaluate_batch(['A', 'B'])
+
+def test_evaluate_batch_invalid_value_type(simple_factor):
+    with pytest.raises(ValueError, match="The values of the assignments must be integer arrays"):
+        simple_factor.evaluate_batch({'A': np.array([0.5]), 'B': np.array([1])})
+
+def test_evaluate_batch_missing_variable(simple_factor):
+    with pytest.raises(ValueError, match="The assignments are invalid"):
+        simple_factor.evaluate_batch({'A': np.array([0])})
+
+def test_evaluate_batch_mismatched_lengths(simple_factor):
+    with pytest.raises(ValueError, match="The assignments must be 1-dimensional arrays of the same length"):
+        simple_factor.evaluate_batch({'A': np.array([0, 1]), 'B': np.array([1])})
+
+def test_evaluate_batch_out_of_bounds_assignment(simple_factor):
+    with pytest.raises(ValueError, match="The values are invalid for variable A"):
+        simple_factor.evaluate_batch({'A': np.array([0, 2]), 'B': np.array([0, 0])})
+
+## correctness
+def test_evaluate_batch_simple(complex_factor):
+    result = complex_factor.evaluate_batch({
+        'C': np.array([0, 1, 1]),
+        'A': np.array([0, 0, 1]),
+        'B': np.array([0, 1, 1])
+    })
+    np.testing.assert_array_almost_equal(result, np.array([0.1, 0.4, 0.8]))
+
 # multiply
 ## validation
 def test_multiply_invalid_factor_type(simple_factor):
@@ -88,23 +139,180 @@ def test_multiply_simple(simple_factor):
 def test_multiply_complex(simple_factor, complex_factor):
     result = simple_factor.multiply(complex_factor)
     assert result.scope == ['A', 'B', 'C']
-    print(result.values)
     expected_results = np.array([[[0.01, 0.02], [0.06, 0.08]], [[0.15, 0.18], [0.28, 0.32]]])
     np.testing.assert_array_almost_equal(result.values, expected_results)
 
+def test_multiply_reordered_scope():
+    factor_1 = Factor(['A', 'B'], np.array([[1.0, 2.0], [3.0, 4.0]]))
+    factor_2 = Factor(['C', 'A'], np.array([[1.0, 10.0], [100.0, 1000.0]]))
+    result = factor_1.multiply(factor_2)
+    assert result.scope == ['A', 'B', 'C']
+    expected_results = np.array([[[1.0, 100.0], [2.0, 200.0]], [[30.0, 3000.0], [40.0, 4000.0]]])
+    np.testing.assert_array_almost_equal(result.values, expected_results)
+
+# product
+## validation
+def test_product_empty_list():
+    with pytest.raises(ValueError, match="The factors must be a non-empty list"):
+        Factor.product([])
+
+def test_product_invalid_factor_type(simple_factor):
+    with pytest.raises(ValueError, match="The factors must be instances of the Factor class"):
+        Factor.product([simple_factor, 'factor'])
+
+def test_product_sum_out_invalid_variable(simple_factor):
+    with pytest.raises(ValueError, match="The variable to sum out is not in the factors"):
+        Factor.product([simple_factor], 'C')
+
+## correctness
+def test_product_single(simple_factor):
+    result = Factor.product([simple_factor])
+    assert result.scope == ['A', 'B']
+    np.testing.assert_array_almost_equal(result.values, simple_factor.values)
+
+def test_product_matches_chained_multiply(simple_factor, complex_factor):
+    factor = Factor(['C', 'D'], np.array([[0.5, 0.5], [0.9, 0.1]]))
+    result = Factor.product([simple_factor, complex_factor, factor])
+    expected = simple_factor.multiply(complex_factor).multiply(factor)
+    assert result.scope == ['A', 'B', 'C', 'D']
+    np.testing.assert_array_almost_equal(result.values, expected.values)
+
+def test_product_does_not_share_memory(simple_factor):
+    result = Factor.product([simple_factor])
+    assert not np.shares_memory(result.values, simple_factor.values)
+
+def test_product_summing_out_variable(simple_factor, complex_factor):
+    factor = Factor(['C', 'D'], np.array([[0.5, 0.5], [0.9, 0.1]]))
+    result = Factor.product([simple_factor, complex_factor, factor], 'C')
+    expected = Factor.product([simple_factor, complex_factor, factor]).sum_out('C')
+    assert result.scope == ['A', 'B', 'D']
+    np.testing.assert_array_almost_equal(result.values, expected.values)
+
+def test_product_summing_out_only_variable():
+    factor = Factor(['A'], np.array([0.25, 0.75]))
+    with pytest.raises(ValueError, match="The variable to sum out is the only variable in the factors"):
+        Factor.product([factor, factor], 'A')
+
+def test_product_unchecked_summing_out_only_variable():
+    factor = Factor(['A'], np.array([0.25, 0.75]))
+    result = Factor._product([factor, factor], 'A')
+    assert result.scope == []
+    assert result.values == pytest.approx(0.625)
+
+def test_product_optimised_path_matches_unoptimised():
+    rng = np.random.default_rng(1)
+    a, b, c = rng.random((16, 16, 4)), rng.random((16, 4, 4)), rng.random((4, 4))
+    factors = [Factor(['A', 'B', 'C'], a), Factor(['A', 'D', 'E'], b), Factor(['C', 'D'], c)]
+    Factor._einsum_paths.clear()
+    # The full product has 16 * 16 * 4 * 4 * 4 = 16384 >= 4096 entries, so the
+    # contraction follows a path
+    result = Factor.product(factors, 'A')
+    assert len(Factor._einsum_paths) == 1
+    expected = np.einsum(a, [0, 1, 2], b, [0, 3, 4], c, [2, 3], [1, 2, 3, 4], optimize=False)
+    assert result.scope == ['B', 'C', 'D', 'E']
+    np.testing.assert_array_almost_equal(result.values, expected)
+    assert result.values.flags.c_contiguous
+
+def test_product_small_factors_skip_path(simple_factor, complex_factor):
+    factor = Factor(['C', 'D'], np.array([[0.5, 0.5], [0.9, 0.1]]))
+    Factor._einsum_paths.clear()
+    Factor.product([simple_factor, complex_factor, factor], 'C')
+    assert len(Factor._einsum_paths) == 0
+
+def test_product_summing_out_large_factors():
+    rng = np.random.default_rng(0)
+    factors = [
+        Factor(['A', 'B', 'C'], rng.random((8, 8, 8))),
+        Factor(['B', 'D', 'E'], rng.random((8, 8, 8))),
+        Factor(['B', 'F'], rng.random((8, 8))),
+    ]
+    Factor._einsum_paths.clear()
+    result = Factor._product(factors, 'B')
+    expected = Factor.product(factors).sum_out('B')
+    assert result.scope == ['A', 'C', 'D', 'E', 'F']
+    np.testing.assert_array_almost_equal(result.values, expected.values)
+    assert result.values.flags.c_contiguous
+    # The contraction path is cached and reused for the same shapes
+    assert len(Factor._einsum_paths) == 1
+    Factor._product(factors, 'B')
+    assert len(Factor._einsum_paths) == 1
+
+# reduce
+## validation
+def test_reduce_invalid_assignment_type(simple_factor):
+    with pytest.raises(ValueError, match="The assignments must be a dictionary"):
+        simple_factor.reduce(['A'])
+
+def test_reduce_invalid_value_type(simple_factor):
+    with pytest.raises(ValueError, match="The values of the assignments must be integers"):
+        simple_factor.reduce({'A': 0.5})
+
+def test_reduce_out_of_bounds_assignment(simple_factor):
+    with pytest.raises(ValueError, match="The value 2 is invalid for variable B"):
+        simple_factor.reduce({'B': 2})
+
+## correctness
+def test_reduce_simple(complex_factor):
+    result = complex_factor.reduce({'B': 1})
+    assert result.scope == ['A', 'C']
+    np.testing.assert_array_almost_equal(result.values, np.array([[0.3, 0.4], [0.7, 0.8]]))
+
+def test_reduce_values_c_contiguous(complex_factor):
+    result = complex_factor.reduce({'B': 1})
+    assert result.values.flags.c_contiguous
+
+def test_reduce_ignores_other_variables(simple_factor):
+    result = simple_factor.reduce({'A': 1, 'D': 0})
+    assert result.scope == ['B']
+    np.testing.assert_array_almost_equal(result.values, np.array([0.3, 0.4]))
+
+def test_reduce_all_variables(simple_factor):
+    result = simple_factor.reduce({'A': 1, 'B': 0})
+    assert result.scope == []
+    assert np.isclose(result.values, 0.3)
+
+# normalise
+## validation
+def test_normalise_zero_factor():
+    factor = Factor(['A'], np.array([0.0, 0.0]))
+    with pytest.raises(ValueError, match="The factor cannot be normalised, as its values sum to zero"):
+        factor.normalise()
+
+## correctness
+def test_normalise_simple(simple_factor):
+    result = simple_factor.normalise()
+    assert result.scope == ['A', 'B']
+    np.testing.assert_array_almost_equal(result.values, np.array([[0.1, 0.2], [0.3, 0.4]]))
+
+def test_normalise_unnormalised():
+    factor = Factor(['A'], np.array([1.0, 3.0]))
+    np.testing.assert_array_almost_equal(factor.normalise().values, np.array([0.25, 0.75]))
+
+def test_normalise_preserves_dtype():
+    factor = Factor(['A'], np.array([1.0, 3.0], dtype=np.float32))
+    result = factor.normalise()
+    assert result.values.dtype == np.float32
+    np.testing.assert_array_almost_equal(result.values, [0.25, 0.75])
+
 # sum_out
-# def test_sum_out_invalid_variable():
-#     factor = Factor(['A', 'B'], np.array([[0.1, 0.2], [0.3, 0.4]]))
-#     with pytest.raises(ValueError):
-#         sum_out(factor, 'C')
-
-# def test_sum_out_trivial():
-#     factor = Factor(['A'], np.array([0.1, 0.9]))
-#     with pytest.raises(ValueError):
-#         sum_out(factor, 'A')
-
-# def test_sum_out_simple_1():
-#     factor = Factor(['A', 'B'], np.array([[0.1, 0.9], [0.8, 0.2]]))
-#     result = sum_out(factor, 'A')
-#     assert result.scope == ['B']
-#     np.testing.assert_array_almost_equal(result.probabilities, np.array([0.9, 1.1]))
+## validation
+def test_sum_out_invalid_variable(simple_factor):
+    with pytest.raises(ValueError, match="The variable to sum out is not in the factor"):
+        simple_factor.sum_out('C')
+
+def test_sum_out_trivial():
+    factor = Factor(['A'], np.array([0.1, 0.9]))
+    with pytest.raises(ValueError, match="The variable to sum out is the only variable in the factor"):
+        factor.sum_out('A')
+
+## correctness
+def test_sum_out_simple():
+    factor = Factor(['A', 'B'], np.array([[0.1, 0.9], [0.8, 0.2]]))
+    result = factor.sum_out('A')
+    assert result.scope == ['B']
+    np.testing.assert_array_almost_equal(result.values, np.array([0.9, 1.1]))
+
+def test_sum_out_complex(complex_factor):
+    result = complex_factor.sum_out('B')
+    assert result.scope == ['A', 'C']
+    np.testing.assert_array_almost_equal(result.values, np.array([[0.4, 0.6], [1.2, 1.4]]))
@@ -0,0 +1,134 @@
+import pytest
+import numpy as np
+
+from cassandra.core import Factor, LogFactor
+from cassandra.core.algorithms import sum_product_eliminate
+
+@pytest.fixture
+def factor_ab():
+    return Factor(['A', 'B'], np.array([[0.1, 0.2], [0.3, 0.4]]))
+
+@pytest.fixture
+def factor_bc():
+    return Factor(['B', 'C'], np.array([[0.5, 0.5], [0.9, 0.1]]))
+
+@pytest.fixture
+def log_factor_ab(factor_ab):
+    return LogFactor.from_factor(factor_ab)
+
+@pytest.fixture
+def log_factor_bc(factor_bc):
+    return LogFactor.from_factor(factor_bc)
+
+# from_factor
+## validation
+def test_from_factor_invalid_factor_type():
+    with pytest.raises(ValueError, match="The factor must be a Factor in linear space"):
+        LogFactor.from_factor('factor')
+
+def test_from_factor_log_factor(log_factor_ab):
+    with pytest.raises(ValueError, match="The factor must be a Factor in linear space"):
+        LogFactor.from_factor(log_factor_ab)
+
+## correctness
+def test_from_factor_zero_values():
+    log_factor = LogFactor.from_factor(Factor(['A'], np.array([0.0, 1.0])))
+    assert log_factor.values[0] == -np.inf
+    np.testing.assert_array_almost_equal(log_factor.to_factor().values, [0.0, 1.0])
+
+# evaluate
+def test_evaluate(log_factor_ab):
+    assert log_factor_ab.evaluate({'A': 1, 'B': 0}) == pytest.approx(0.3)
+
+def test_evaluate_batch(log_factor_ab):
+    np.testing.assert_array_almost_equal(
+        log_factor_ab.evaluate_batch({'A': np.array([0, 1]), 'B': np.array([1, 1])}),
+        [0.2, 0.4]
+    )
+
+# multiply
+## validation
+def test_multiply_invalid_factor_type(log_factor_ab):
+    with pytest.raises(ValueError, match="The other factor must be a LogFactor"):
+        log_factor_ab.multiply('factor')
+
+def test_multiply_linear_factor(log_factor_ab, factor_bc):
+    with pytest.raises(TypeError, match="A LogFactor cannot be multiplied by a linear-space Factor"):
+        log_factor_ab * factor_bc
+
+def test_factor_multiply_log_factor(factor_ab, log_factor_bc):
+    with pytest.raises(TypeError, match="A Factor cannot be multiplied by a LogFactor"):
+        factor_ab * log_factor_bc
+
+## correctness
+def test_multiply_matches_factor(factor_ab, factor_bc, log_factor_ab, log_factor_bc):
+    result = log_factor_ab * log_factor_bc
+    expected = factor_ab * factor_bc
+    assert isinstance(result, LogFactor)
+    assert result.scope == expected.scope
+    np.testing.assert_array_almost_equal(result.to_factor().values, expected.values)
+
+def test_multiply_reordered_scope(factor_ab, log_factor_ab):
+    other = Factor(['B', 'A'], np.array([[0.5, 0.6], [0.7, 0.8]]))
+    result = log_factor_ab * LogFactor.from_factor(other)
+    expected = factor_ab * other
+    np.testing.assert_array_almost_equal(result.to_factor().values, expected.values)
+
+# product
+## validation
+def test_product_invalid_factor_type(log_factor_ab):
+    with pytest.raises(ValueError, match="The factors must be instances of the LogFactor class"):
+        LogFactor.product([log_factor_ab, 'factor'])
+
+def test_product_linear_factor(log_factor_ab, factor_bc):
+    with pytest.raises(TypeError, match="The factors must be LogFactors"):
+        LogFactor.product([log_factor_ab, factor_bc])
+
+def test_factor_product_log_factor(factor_ab, log_factor_bc):
+    with pytest.raises(TypeError, match="The factors must not be LogFactors"):
+        Factor.product([factor_ab, log_factor_bc])
+
+def test_sum_product_eliminate_log_factor(log_factor_ab, log_factor_bc):
+    with pytest.raises(TypeError, match="The factors must be linear-space Factors, not LogFactors"):
+        sum_product_eliminate([log_factor_ab, log_factor_bc], 'B')
+
+## correctness
+def test_product_summing_out_variable(factor_ab, factor_bc, log_factor_ab, log_factor_bc):
+    result = LogFactor.product([log_factor_ab, log_factor_bc], 'B')
+    expected = Factor.product([factor_ab, factor_bc], 'B')
+    assert result.scope == ['A', 'C']
+    np.testing.assert_array_almost_equal(result.to_factor().values, expected.values)
+
+def test_product_does_not_underflow():
+    factor = Factor(['A', 'B'], np.array([[1e-200], [1e-200]]))
+    product = Factor.product([factor, factor], 'A')
+    log_product = LogFactor.product([LogFactor.from_factor(factor)] * 2, 'A')
+    assert product.values[0] == 0
+    assert log_product.values[0] == pytest.approx(np.log(2) - 400 * np.log(10))
+
+# reduce
+def test_reduce(log_factor_ab):
+    result = log_factor_ab.reduce({'B': 1})
+    assert isinstance(result, LogFactor)
+    np.testing.assert_array_almost_equal(result.to_factor().values, [0.2, 0.4])
+
+# sum_out
+def test_sum_out(log_factor_ab):
+    result = log_factor_ab.sum_out('A')
+    np.testing.assert_array_almost_equal(result.to_factor().values, [0.4, 0.6])
+
+def test_sum_out_impossible_states():
+    factor = Factor(['A', 'B'], np.array([[0.0, 0.5], [0.0, 0.5]]))
+    result = LogFactor.from_factor(factor).sum_out('A')
+    assert result.values[0] == -np.inf
+    assert result.values[1] == pytest.approx(0.0)
+
+# normalise
+def test_normalise_zero_factor():
+    log_factor = LogFactor.from_factor(Factor(['A'], np.array([0.0, 0.0])))
+    with pytest.raises(ValueError, match="The factor cannot be normalised, as its values sum to zero"):
+        log_factor.normalise()
+
+def test_normalise(factor_ab, log_factor_ab):
+    result = log_factor_ab.normalise()
+    np.testing.assert_array_almost_equal(result.to_factor().values, factor_ab.normalise().values)
@@ -16,11 +16,28 @@ def test_init_nodes_unique(simple_nodes):
     with pytest.raises(ValueError):
         Network(list(simple_nodes) + list(simple_nodes))
 
+def test_init_variable_names_unique(simple_nodes):
+    node_a, _, _ = simple_nodes
+    duplicate_node_a = Node("A", [], np.array([0.5, 0.5]))
+    with pytest.raises(ValueError, match="The variable names of the nodes must be unique"):
+        Network([node_a, duplicate_node_a])
+
 def test_init_closed_network(simple_nodes):
     _, node_b, node_c = simple_nodes
     with pytest.raises(ValueError):
         Network([node_b, node_c])
 
+def test_init_cyclic_network(simple_nodes):
+    node_a, node_b, node_c = simple_nodes
+    node_a.parent_nodes.append(node_c)
+    with pytest.raises(ValueError, match="The network is not a directed acyclic graph"):
+        Network([node_a, node_b, node_c])
+
+def test_init_topological_order(complex_nodes):
+    node_a, node_b, node_c, node_d = complex_nodes
+    network = Network([node_d, node_c, node_b, node_a])
+    assert list(network.nodes) == ['A', 'B', 'C', 'D']
+
 # get_cardinality
 def test_get_cardinality(simple_nodes):
     network = Network(list(simple_nodes))
@@ -51,6 +68,15 @@ def test_joint_probability_invalid_values(simple_nodes):
             'C': 2
         })
 
+def test_joint_probability_non_integer_values(simple_nodes):
+    network = Network(list(simple_nodes))
+    with pytest.raises(ValueError):
+        network.evaluate_joint_probability({
+            'A': 0,
+            'B': 0.5,
+            'C': 1
+        })
+
 def test_joint_probability_simple(simple_nodes):
     network = Network(list(simple_nodes))
     # Assignment {A=0, B=0, C=0}:
@@ -102,6 +128,72 @@ def test_joint_probability_complex(complex_nodes):
         'D': 0
     }), 0.0224)
 
+# log_joint_probability
+def test_log_joint_probability_missing_inputs(simple_nodes):
+    network = Network(list(simple_nodes))
+    with pytest.raises(ValueError):
+        network.evaluate_log_joint_probability({'A': 0, 'B': 1})
+
+def test_log_joint_probability_simple(simple_nodes):
+    network = Network(list(simple_nodes))
+    # => P(A=0, B=0, C=0) = 0.6 * 0.7 * 0.9 = 0.378
+    assert np.isclose(network.evaluate_log_joint_probability({
+        'A': 0,
+        'B': 0,
+        'C': 0
+    }), np.log(0.378))
+
+def test_log_joint_probability_matches_joint_probability(complex_nodes):
+    network = Network(list(complex_nodes))
+    e = {'A': 1, 'B': 0, 'C': 1, 'D': 0}
+    assert np.isclose(network.evaluate_log_joint_probability(e), np.log(network.evaluate_joint_probability(e)))
+
+def test_log_joint_probability_impossible_state():
+    node_a = Node("A", [], np.array([1.0, 0.0]))
+    network = Network([node_a])
+    assert network.evaluate_log_joint_probability({'A': 1}) == -np.inf
+
+# joint_probability_batch
+def test_joint_probability_batch_bad_input(simple_nodes):
+    network = Network(list(simple_nodes))
+    with pytest.raises(TypeError, match="The evidence variables must be a dictionary"):
+        network.evaluate_joint_probability_batch([np.array([0])])
+
+def test_joint_probability_batch_missing_inputs(simple_nodes):
+    network = Network(list(simple_nodes))
+    with pytest.raises(ValueError, match="The evidence variables must be complete"):
+        network.evaluate_joint_probability_batch({'A': np.array([0]), 'B': np.array([0])})
+
+def test_joint_probability_batch_empty_network():
+    network = Network([])
+    with pytest.raises(ValueError, match="The evidence variables must not be empty"):
+        network.evaluate_joint_probability_batch({})
+
+def test_joint_probability_batch_non_integer_values(simple_nodes):
+    network = Network(list(simple_nodes))
+    with pytest.raises(ValueError, match="The evidence observations must be integer arrays"):
+        network.evaluate_joint_probability_batch({'A': np.array([0]), 'B': np.array([0]), 'C': np.array([0.0])})
+
+def test_joint_probability_batch_mismatched_lengths(simple_nodes):
+    network = Network(list(simple_nodes))
+    with pytest.raises(ValueError, match="The evidence observations must be 1-dimensional arrays of the same length"):
+        network.evaluate_joint_probability_batch({'A': np.array([0]), 'B': np.array([0]), 'C': np.array([0, 1])})
+
+def test_joint_probability_batch_invalid_values(simple_nodes):
+    network = Network(list(simple_nodes))
+    with pytest.raises(ValueError, match="The evidence observations are invalid"):
+        network.evaluate_joint_probability_batch({'A': np.array([0]), 'B': np.array([0]), 'C': np.array([2])})
+
+def test_joint_probability_batch_complex(complex_nodes):
+    network = Network(list(complex_nodes))
+    probs = network.evaluate_joint_probability_batch({
+        'A': np.array([0, 1]),
+        'B': np.array([0, 0]),
+        'C': np.array([0, 1]),
+        'D': np.array([1, 0])
+    })
+    assert np.allclose(probs, [0.0756, 0.0224])
+
 # query
 def test_query_bad_input(simple_nodes):
     network = Network(list(simple_nodes))
@@ -129,3 +221,153 @@ def test_query_empty_network():
     network = Network([])
     with pytest.raises(ValueError):
         network.query({'A'}, {'B': 0})  # Query on an empty network
+
+def test_query_invalid_evidence_value(simple_nodes):
+    network = Network(list(simple_nodes))
+    with pytest.raises(ValueError):
+        network.query({'A'}, {'B': 2})
+
+def test_query_zero_probability_evidence():
+    node_a = Node("A", [], np.array([1.0, 0.0]))
+    node_b = Node("B", [node_a], np.array([[0.5, 0.5], [0.5, 0.5]]))
+    network = Network([node_a, node_b])
+    with pytest.raises(ValueError, match="The evidence has zero probability"):
+        network.query({'B'}, {'A': 1})
+
+def brute_force_query(network, Y, e):
+    # Computes P(Y | e) by enumerating every assignment of the network
+    variable_names = sorted(network.get_variable_names())
+    cardinalities = [network.nodes[name].get_cardinality() for name in variable_names]
+    Y = sorted(Y)
+    result = np.zeros([network.nodes[name].get_cardinality() for name in Y])
+    for states in np.ndindex(*cardinalities):
+        assignment = dict(zip(variable_names, map(int, states)))
+        if any(assignment[name] != value for name, value in e.items()):
+            continue
+        result[tuple(assignment[name] for name in Y)] += network.evaluate_joint_probability(assignment)
+    return Y, result / result.sum()
+
+def assert_query_matches_brute_force(network, Y, e):
+    result = network.query(Y, e)
+    expected_scope, expected_values = brute_force_query(network, Y, e)
+    assert sorted(result.scope) == expected_scope
+    axes = [result.scope.index(name) for name in expected_scope]
+    np.testing.assert_array_almost_equal(np.transpose(result.values, axes), expected_values)
+
+def test_query_no_evidence(simple_nodes):
+    network = Network(list(simple_nodes))
+    result = network.query({'A'}, {})
+    assert result.scope == ['A']
+    np.testing.assert_array_almost_equal(result.values, np.array([0.6, 0.4]))
+    assert_query_matches_brute_force(network, {'C'}, {})
+
+def test_query_simple(simple_nodes):
+    network = Network(list(simple_nodes))
+    assert_query_matches_brute_force(network, {'A'}, {'C': 1})
+    assert_query_matches_brute_force(network, {'B'}, {'A': 0})
+    assert_query_matches_brute_force(network, {'A', 'B'}, {'C': 0})
+
+def test_query_complex(complex_nodes):
+    network = Network(list(complex_nodes))
+    assert_query_matches_brute_force(network, {'A'}, {'D': 1})
+    assert_query_matches_brute_force(network, {'C'}, {'A': 1, 'D': 0})
+    assert_query_matches_brute_force(network, {'B', 'D'}, {})
+
+def test_query_cached(simple_nodes):
+    network = Network(list(simple_nodes))
+    result = network.query({'A'}, {'C': 1})
+    assert np.shares_memory(network.query({'A'}, {'C': 1}).values, result.values)
+    assert not np.shares_memory(network.query({'A'}, {'C': 0}).values, result.values)
+    with pytest.raises(ValueError):
+        result.values[0] = 1.0
+
+def test_query_cached_result_not_shared(simple_nodes):
+    network = Network(list(simple_nodes))
+    result = network.query({'A'}, {'C': 1})
+    result.scope.append('Z')
+    result.values = np.array([1.0, 0.0])
+    cached = network.query({'A'}, {'C': 1})
+    assert cached is not result
+    assert cached.scope == ['A']
+    assert_query_matches_brute_force(network, {'A'}, {'C': 1})
+
+def test_query_cache_size(simple_nodes):
+    network = Network(list(simple_nodes))
+    network.QUERY_CACHE_SIZE = 1
+    result = network.query({'A'}, {'C': 1})
+    network.query({'A'}, {'C': 0})
+    assert not np.shares_memory(network.query({'A'}, {'C': 1}).values, result.values)
+
+def test_query_float32(complex_nodes):
+    network = Network(list(complex_nodes), dtype=np.float32)
+    result = network.query({'A'}, {'D': 1})
+    assert result.values.dtype == np.float32
+    expected = Network(list(complex_nodes)).query({'A'}, {'D': 1})
+    np.testing.assert_allclose(result.values, expected.values, rtol=1e-6)
+
+def test_init_invalid_dtype(simple_nodes):
+    with pytest.raises(ValueError):
+        Network(list(simple_nodes), dtype=np.int64)
+
+# _get_query_plan
+def test_query_plan(complex_nodes):
+    network = Network(list(complex_nodes))
+    relevant_variable_names, elimination_ordering = network._get_query_plan({'C'}, {'B': 0})
+    assert relevant_variable_names == {'A', 'B', 'C'}
+    assert elimination_ordering == ('A',)
+
+def test_query_plan_cached(complex_nodes):
+    network = Network(list(complex_nodes))
+    plan = network._get_query_plan({'C'}, {'B': 0})
+    assert network._get_query_plan({'C'}, {'B': 1}) is plan
+
+def test_query_plan_cache_size(complex_nodes):
+    network = Network(list(complex_nodes))
+    network.QUERY_CACHE_SIZE = 1
+    plan = network._get_query_plan({'C'}, {'B': 1})
+    network._get_query_plan({'A'}, {'D': 0})
+    assert len(network._query_plans) == 1
+    assert network._get_query_plan({'C'}, {'B': 1}) is not plan
+
+# _get_joint_factorisation
+def test_joint_factorisation(simple_nodes):
+    network = Network(list(simple_nodes))
+    factors = network._get_joint_factorisation()
+    assert [factor.scope for factor in factors] == [['A'], ['A', 'B'], ['A', 'B', 'C']]
+
+def test_joint_factorisation_is_a_copy(simple_nodes):
+    network = Network(list(simple_nodes))
+    network._get_joint_factorisation().pop()
+    assert len(network._get_joint_factorisation()) == 3
+
+def test_joint_factorisation_selected_variables(simple_nodes):
+    network = Network(list(simple_nodes))
+    factors = network._get_joint_factorisation({'A', 'B'})
+    assert [factor.scope for factor in factors] == [['A'], ['A', 'B']]
+
+# _get_ancestral_variable_names
+def test_ancestral_variable_names(complex_nodes):
+    network = Network(list(complex_nodes))
+    assert network._get_ancestral_variable_names({'A'}) == {'A'}
+    assert network._get_ancestral_variable_names({'C'}) == {'A', 'B', 'C'}
+    assert network._get_ancestral_variable_names({'B', 'D'}) == {'A', 'B', 'C', 'D'}
+
+def test_query_barren_variables(complex_nodes):
+    network = Network(list(complex_nodes))
+    # D is not an ancestor of B or A, so it is pruned from the query
+    assert_query_matches_brute_force(network, {'B'}, {'A': 1})
+
+# _get_elimination_ordering
+def test_elimination_ordering_contains_variables(simple_nodes):
+    network = Network(list(simple_nodes))
+    assert sorted(network._get_elimination_ordering({'A', 'B'}, {})) == ['A', 'B']
+
+def test_elimination_ordering_min_fill(complex_nodes):
+    network = Network(list(complex_nodes))
+    # Eliminating A adds no fill edges (B and C are already connected), whereas
+    # eliminating B or C would connect A and D
+    assert network._get_elimination_ordering({'A', 'B', 'C'}, {}) == ['A', 'B', 'C']
+
+def test_elimination_ordering_excludes_evidence(complex_nodes):
+    network = Network(list(complex_nodes))
+    assert network._get_elimination_ordering({'A', 'C'}, {'B': 0}) == ['A', 'C']
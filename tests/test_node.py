@@ -10,6 +10,12 @@ def test_init_valid_inputs(simple_nodes):
     assert node_a.parent_nodes == []
     np.testing.assert_array_equal(node_a.cpd, np.array([0.6, 0.4]))
 
+def test_init_parent_variable_names(simple_nodes):
+    node_a, node_b, node_c = simple_nodes
+    assert node_a.parent_variable_names == ()
+    assert node_b.parent_variable_names == ("A",)
+    assert node_c.parent_variable_names == ("A", "B")
+
 def test_init_invalid_cpd():
     with pytest.raises(ValueError):
         Node("D", [], [0.5, 0.5])
@@ -127,3 +133,63 @@ def test_compute_conditional_probability(simple_nodes):
     assert node_c.compute_conditional_probability(0, {"A": 1, "B": 1}) == pytest.approx(0.1)
     assert node_c.compute_conditional_probability(1, {"A": 1, "B": 1}) == pytest.approx(0.9)
 
+# compute_conditional_probability_batch
+def test_compute_conditional_probability_batch_invalid_input(simple_nodes):
+    _, node_b, _ = simple_nodes
+    with pytest.raises(ValueError, match="All inputs should be integer arrays"):
+        node_b.compute_conditional_probability_batch(np.array([0.0]), {"A": np.array([0])})
+
+def test_compute_conditional_probability_batch_missing_parent(simple_nodes):
+    _, node_b, _ = simple_nodes
+    with pytest.raises(ValueError, match="Not all parent nodes are provided"):
+        node_b.compute_conditional_probability_batch(np.array([0]), {})
+
+def test_compute_conditional_probability_batch_mismatched_lengths(simple_nodes):
+    _, node_b, _ = simple_nodes
+    with pytest.raises(ValueError, match="The assignments must be 1-dimensional arrays of the same length"):
+        node_b.compute_conditional_probability_batch(np.array([0, 1]), {"A": np.array([0])})
+
+def test_compute_conditional_probability_batch_invalid_state(simple_nodes):
+    _, node_b, _ = simple_nodes
+    with pytest.raises(ValueError, match="The variable assignments are invalid"):
+        node_b.compute_conditional_probability_batch(np.array([2]), {"A": np.array([0])})
+
+def test_compute_conditional_probability_batch_invalid_parent_state(simple_nodes):
+    _, node_b, _ = simple_nodes
+    with pytest.raises(ValueError, match="The states of parent node A are invalid"):
+        node_b.compute_conditional_probability_batch(np.array([0]), {"A": np.array([2])})
+
+def test_compute_conditional_probability_batch(simple_nodes):
+    node_a, _, node_c = simple_nodes
+    assert np.allclose(node_a.compute_conditional_probability_batch(np.array([0, 1, 0]), {}), [0.6, 0.4, 0.6])
+    probs = node_c.compute_conditional_probability_batch(
+        np.array([0, 1, 0, 1]),
+        {"A": np.array([0, 0, 1, 1]), "B": np.array([0, 1, 0, 1])}
+    )
+    assert np.allclose(probs, [0.9, 0.5, 0.3, 0.9])
+
+# to_factor
+def test_to_factor_no_parents(simple_nodes):
+    node_a, _, _ = simple_nodes
+    factor = node_a.to_factor()
+    assert factor.scope == ['A']
+    np.testing.assert_array_equal(factor.values, np.array([0.6, 0.4]))
+
+def test_to_factor_with_parents(simple_nodes):
+    _, _, node_c = simple_nodes
+    factor = node_c.to_factor()
+    assert factor.scope == ['A', 'B', 'C']
+    assert factor.evaluate({'A': 1, 'B': 0, 'C': 1}) == pytest.approx(0.7)
+
+def test_to_factor_integer_cpd():
+    node = Node("E", [], np.array([1, 0]))
+    factor = node.to_factor()
+    np.testing.assert_array_equal(factor.values, np.array([1.0, 0.0]))
+
+def test_to_factor_dtype(simple_nodes):
+    _, node_b, _ = simple_nodes
+    factor = node_b.to_factor(np.float32)
+    assert factor.values.dtype == np.float32
+    np.testing.assert_array_almost_equal(factor.values, node_b.cpd)
+    with pytest.raises(ValueError):
+        node_b.to_factor(np.int64)